@@ -3,15 +3,25 @@
 Demo script to showcase KQL Generator functionality
 """
 
+import functools
+import sys
+
 from kql_generator import KQLQueryGenerator
 
 
+@functools.lru_cache(maxsize=None)
+def _gen() -> KQLQueryGenerator:
+    """Return the generator shared by all demo sections, created on first use."""
+    return KQLQueryGenerator()
+
+
 def demo_prompt_generation():
     """Demonstrate query generation from prompts."""
-    print("🔍 KQL Generator Demo - Prompt-based Generation")
-    print("=" * 60)
+    buf = []
+    buf.append("🔍 KQL Generator Demo - Prompt-based Generation")
+    buf.append("=" * 60)
     
-    generator = KQLQueryGenerator()
+    generator = _gen()
     
     test_prompts = [
         "failed login attempts",
@@ -23,34 +33,39 @@ def demo_prompt_generation():
     ]
     
     for prompt in test_prompts:
-        print(f"\n📝 Prompt: '{prompt}'")
-        print("-" * 40)
+        buf.append(f"\n📝 Prompt: '{prompt}'")
+        buf.append("-" * 40)
         query = generator.generate_from_prompt(prompt)
-        print(query)
-        print()
+        buf.append(query)
+        buf.append("")
+    
+    sys.stdout.write("\n".join(buf) + "\n")
 
 
 def demo_template_usage():
     """Demonstrate template-based generation."""
-    print("\n🛠️ KQL Generator Demo - Template Usage")
-    print("=" * 60)
+    buf = []
+    buf.append("\n🛠️ KQL Generator Demo - Template Usage")
+    buf.append("=" * 60)
     
-    generator = KQLQueryGenerator()
+    generator = _gen()
     
     # Show available templates
-    print("\nAvailable Templates:")
+    buf.append("\nAvailable Templates:")
     for name, template in generator.query_templates.items():
-        print(f"• {name}: {template['description']}")
+        buf.append(f"• {name}: {template['description']}")
     
-    print("\n📋 Sample Template Output (failed_logins with defaults):")
-    print("-" * 50)
+    buf.append("\n📋 Sample Template Output (failed_logins with defaults):")
+    buf.append("-" * 50)
     
     # Generate a sample query with default parameters
-    query = generator.query_templates["failed_logins"]["template"].format(
+    query = generator.query_templates["failed_logins"]["compiled"](
         timeframe="7d", 
         user_filter="admin"
     )
-    print(query)
+    buf.append(query)
+    
+    sys.stdout.write("\n".join(buf) + "\n")
 
 
 def main():
@@ -3,110 +3,116 @@
 Demo script to showcase NIST 800-171 GRC Compliance Tool functionality
 """
 
+import itertools
+import sys
+
 from nist_800_171_grc import NISTGRCAssessment, ControlFamily
 
 
-def demo_compliance_assessment():
+def demo_compliance_assessment(assessment: NISTGRCAssessment):
     """Demonstrate full compliance assessment."""
-    print("🔍 NIST 800-171 GRC Demo - Full Compliance Assessment")
-    print("=" * 70)
-    
-    assessment = NISTGRCAssessment()
+    buf = []
+    buf.append("🔍 NIST 800-171 GRC Demo - Full Compliance Assessment")
+    buf.append("=" * 70)
     
-    print("\n📋 Available NIST 800-171 Controls:")
+    buf.append("\n📋 Available NIST 800-171 Controls:")
     for control_id, control in assessment.controls.items():
-        print(f"• {control_id}: {control.title}")
+        buf.append(f"• {control_id}: {control.title}")
     
-    print(f"\n🎯 Running assessment on {len(assessment.controls)} controls...")
+    buf.append(f"\n🎯 Running assessment on {len(assessment.controls)} controls...")
     assessment.assess_all_controls()
     
-    print("\n📊 Assessment Results:")
-    print("-" * 50)
+    buf.append("\n📊 Assessment Results:")
+    buf.append("-" * 50)
     summary = assessment._get_compliance_summary()
     total = len(assessment.controls)
     
     for status, count in summary.items():
         if count > 0:
             percentage = (count / total) * 100
-            print(f"• {status.replace('_', ' ').title()}: {count} ({percentage:.1f}%)")
+            buf.append(f"• {status.replace('_', ' ').title()}: {count} ({percentage:.1f}%)")
+    
+    sys.stdout.write("\n".join(buf) + "\n")
 
 
-def demo_control_family_assessment():
+def demo_control_family_assessment(assessment: NISTGRCAssessment):
     """Demonstrate control family assessment."""
-    print("\n🛠️ NIST 800-171 GRC Demo - Control Family Assessment")
-    print("=" * 70)
-    
-    assessment = NISTGRCAssessment()
+    buf = []
+    buf.append("\n🛠️ NIST 800-171 GRC Demo - Control Family Assessment")
+    buf.append("=" * 70)
     
-    print("\n📋 Assessing Access Control Family (3.1):")
-    print("-" * 40)
+    buf.append("\n📋 Assessing Access Control Family (3.1):")
+    buf.append("-" * 40)
     
     family_controls = assessment.assess_control_family(ControlFamily.ACCESS_CONTROL)
     
     for control in family_controls:
-        print(f"\n{control.control_id}: {control.title}")
-        print(f"Status: {control.status.value.title()}")
-        print(f"Azure Services: {', '.join(control.azure_mappings[:3])}...")
+        buf.append(f"\n{control.control_id}: {control.title}")
+        buf.append(f"Status: {control.status.value.title()}")
+        buf.append(f"Azure Services: {', '.join(control.azure_mappings[:3])}...")
         if control.findings:
-            print(f"Key Finding: {control.findings[0]}")
+            buf.append(f"Key Finding: {control.findings[0]}")
+    
+    sys.stdout.write("\n".join(buf) + "\n")
 
 
-def demo_gap_analysis():
+def demo_gap_analysis(assessment: NISTGRCAssessment):
     """Demonstrate gap analysis functionality."""
-    print("\n📈 NIST 800-171 GRC Demo - Gap Analysis")
-    print("=" * 70)
-    
-    assessment = NISTGRCAssessment()
-    assessment.assess_all_controls()
+    buf = []
+    buf.append("\n📈 NIST 800-171 GRC Demo - Gap Analysis")
+    buf.append("=" * 70)
     
     gaps = assessment.generate_gap_analysis()
     
-    print("\n🎯 Compliance Gaps by Priority:")
-    print("-" * 40)
+    buf.append("\n🎯 Compliance Gaps by Priority:")
+    buf.append("-" * 40)
     
     for priority, items in gaps.items():
         if items:
-            print(f"\n{priority.title()} Priority ({len(items)} items):")
+            buf.append(f"\n{priority.title()} Priority ({len(items)} items):")
             for item in items:
-                print(f"  • {item}")
+                buf.append(f"  • {item}")
+    
+    sys.stdout.write("\n".join(buf) + "\n")
 
 
-def demo_azure_mappings():
+def demo_azure_mappings(assessment: NISTGRCAssessment):
     """Demonstrate Azure service mappings."""
-    print("\n☁️ NIST 800-171 GRC Demo - Azure Service Mappings")
-    print("=" * 70)
+    buf = []
+    buf.append("\n☁️ NIST 800-171 GRC Demo - Azure Service Mappings")
+    buf.append("=" * 70)
     
-    assessment = NISTGRCAssessment()
-    
-    print("\n🔗 NIST Controls → Azure Services Mapping:")
-    print("-" * 50)
+    buf.append("\n🔗 NIST Controls → Azure Services Mapping:")
+    buf.append("-" * 50)
     
-    for control_id, control in list(assessment.controls.items())[:3]:  # Show first 3
-        print(f"\n{control_id}: {control.title}")
-        print("Azure Services:")
+    for control_id, control in itertools.islice(assessment.controls.items(), 3):  # Show first 3
+        buf.append(f"\n{control_id}: {control.title}")
+        buf.append("Azure Services:")
         for service in control.azure_mappings:
-            print(f"  • {service}")
+            buf.append(f"  • {service}")
+    
+    sys.stdout.write("\n".join(buf) + "\n")
 
 
-def demo_reporting():
+def demo_reporting(assessment: NISTGRCAssessment):
     """Demonstrate reporting capabilities."""
-    print("\n📊 NIST 800-171 GRC Demo - Compliance Reporting")
-    print("=" * 70)
-    
-    assessment = NISTGRCAssessment()
-    assessment.assess_all_controls()
+    buf = []
+    buf.append("\n📊 NIST 800-171 GRC Demo - Compliance Reporting")
+    buf.append("=" * 70)
     
-    print("\n📋 Sample Summary Report:")
-    print("-" * 30)
+    buf.append("\n📋 Sample Summary Report:")
+    buf.append("-" * 30)
     
     summary_report = assessment.generate_compliance_report("summary")
     # Show first part of the report
-    lines = summary_report.split('\n')
-    for line in lines[:15]:  # Show first 15 lines
-        print(line)
+    # Split at most 15 times; anything past line 15 stays in one tail string
+    lines = summary_report.split('\n', 15)
+    buf.extend(lines[:15])  # Show first 15 lines
     
     if len(lines) > 15:
-        print("... (truncated)")
+        buf.append("... (truncated)")
+    
+    sys.stdout.write("\n".join(buf) + "\n")
 
 
 def main():
@@ -118,11 +124,15 @@ def main():
     print("in Azure cloud environments.")
     print()
     
-    demo_compliance_assessment()
-    demo_control_family_assessment()
-    demo_gap_analysis()
-    demo_azure_mappings()
-    demo_reporting()
+    # Assess once and share the results across all demo sections
+    assessment = NISTGRCAssessment()
+    assessment.assess_all_controls()
+    
+    demo_compliance_assessment(assessment)
+    demo_control_family_assessment(assessment)
+    demo_gap_analysis(assessment)
+    demo_azure_mappings(assessment)
+    demo_reporting(assessment)
     
     print("\n✅ Demo completed successfully!")
     print("\nTo try the tool yourself, run:")
@@ -6,83 +6,200 @@ Designed for cybersecurity professionals working with Azure Sentinel, Microsoft
 """
 
 import argparse
+import functools
+import re
 import sys
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from types import MappingProxyType
 
+try:
+    import ahocorasick
+except ImportError:  # Optional: falls back to regex matching
+    ahocorasick = None
 
-class KQLQueryGenerator:
-    """Main class for generating KQL queries based on user prompts."""
-    
-    def __init__(self):
-        self.query_templates = {
-            "failed_logins": {
-                "description": "Query for failed login attempts",
-                "template": """SigninLogs
+
+# Keywords that map a natural language prompt to a query template
+_PROMPT_KEYWORDS = {
+    "failed_logins": ["failed", "login", "signin", "authentication"],
+    "suspicious_processes": ["process", "execution", "command"],
+    "network_connections": ["network", "connection", "traffic"],
+    "file_modifications": ["file", "creation", "modification"],
+    "privilege_escalation": ["privilege", "escalation", "admin"]
+}
+
+
+def _build_keyword_automaton():
+    """Build an Aho-Corasick automaton over all prompt keywords, if available."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for name, keywords in _PROMPT_KEYWORDS.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, name)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _compile_template(name: str, template: str, parameters: List[str]):
+    """Compile a query template into a function that renders it as an f-string."""
+    func_name = f"render_{name}"
+    source = f"def {func_name}({', '.join(parameters)}): return f{template!r}"
+    namespace = {}
+    exec(compile(source, f"<kql-template:{name}>", "exec"), namespace)
+    return namespace[func_name]
+
+
+def _compile_templates(templates: Dict[str, Dict]) -> MappingProxyType:
+    """Return the templates with a compiled renderer added to each, behind a read-only mapping."""
+    return MappingProxyType({
+        name: {**template, "compiled": _compile_template(name, template["template"], template["parameters"])}
+        for name, template in templates.items()
+    })
+
+
+# Query templates shared by every generator instance, precompiled at import so
+# rendering skips str.format's field parsing
+_TEMPLATES = _compile_templates({
+    "failed_logins": {
+        "description": "Query for failed login attempts",
+        "template": """SigninLogs
 | where TimeGenerated >= ago({timeframe})
 | where ResultType != "0"
 | where UserPrincipalName contains "{user_filter}"
 | project TimeGenerated, UserPrincipalName, IPAddress, Location, ResultType, ResultDescription
 | order by TimeGenerated desc""",
-                "parameters": ["timeframe", "user_filter"]
-            },
-            "suspicious_processes": {
-                "description": "Query for suspicious process execution",
-                "template": """DeviceProcessEvents
+        "parameters": ["timeframe", "user_filter"]
+    },
+    "suspicious_processes": {
+        "description": "Query for suspicious process execution",
+        "template": """DeviceProcessEvents
 | where TimeGenerated >= ago({timeframe})
 | where ProcessCommandLine has_any ({suspicious_commands})
 | project TimeGenerated, DeviceName, ProcessCommandLine, InitiatingProcessFileName, AccountName
 | order by TimeGenerated desc""",
-                "parameters": ["timeframe", "suspicious_commands"]
-            },
-            "network_connections": {
-                "description": "Query for outbound network connections",
-                "template": """DeviceNetworkEvents
+        "parameters": ["timeframe", "suspicious_commands"]
+    },
+    "network_connections": {
+        "description": "Query for outbound network connections",
+        "template": """DeviceNetworkEvents
 | where TimeGenerated >= ago({timeframe})
 | where ActionType == "ConnectionSuccess"
 | where RemoteIP !startswith "10." and RemoteIP !startswith "192.168." and RemoteIP !startswith "172."
 | where RemotePort in ({ports})
 | project TimeGenerated, DeviceName, RemoteIP, RemotePort, LocalIP, InitiatingProcessFileName
 | order by TimeGenerated desc""",
-                "parameters": ["timeframe", "ports"]
-            },
-            "file_modifications": {
-                "description": "Query for file creation/modification events",
-                "template": """DeviceFileEvents
+        "parameters": ["timeframe", "ports"]
+    },
+    "file_modifications": {
+        "description": "Query for file creation/modification events",
+        "template": """DeviceFileEvents
 | where TimeGenerated >= ago({timeframe})
 | where ActionType in ("FileCreated", "FileModified")
 | where FolderPath has_any ({file_paths})
 | project TimeGenerated, DeviceName, FileName, FolderPath, ActionType, InitiatingProcessFileName
 | order by TimeGenerated desc""",
-                "parameters": ["timeframe", "file_paths"]
-            },
-            "privilege_escalation": {
-                "description": "Query for potential privilege escalation attempts",
-                "template": """SecurityEvent
+        "parameters": ["timeframe", "file_paths"]
+    },
+    "privilege_escalation": {
+        "description": "Query for potential privilege escalation attempts",
+        "template": """SecurityEvent
 | where TimeGenerated >= ago({timeframe})
 | where EventID in (4728, 4729, 4732, 4733, 4756, 4757)
 | where Account !endswith "$"
 | project TimeGenerated, Computer, Account, Activity, SubjectUserName
 | order by TimeGenerated desc""",
-                "parameters": ["timeframe"]
-            },
-            "threat_hunting": {
-                "description": "General threat hunting query",
-                "template": """{table_name}
+        "parameters": ["timeframe"]
+    },
+    "threat_hunting": {
+        "description": "General threat hunting query",
+        "template": """{table_name}
 | where TimeGenerated >= ago({timeframe})
 | where {search_field} has "{search_term}"
 | project TimeGenerated, {display_fields}
 | order by TimeGenerated desc
 | take {limit}""",
-                "parameters": ["table_name", "timeframe", "search_field", "search_term", "display_fields", "limit"]
-            }
-        }
-        
-        self.common_tables = [
-            "SigninLogs", "AuditLogs", "SecurityEvent", "DeviceProcessEvents",
-            "DeviceNetworkEvents", "DeviceFileEvents", "DeviceLogonEvents",
-            "ThreatIntelligenceIndicator", "SecurityAlert", "SecurityIncident"
-        ]
+        "parameters": ["table_name", "timeframe", "search_field", "search_term", "display_fields", "limit"]
+    }
+})
+
+_COMMON_TABLES = (
+    "SigninLogs", "AuditLogs", "SecurityEvent", "DeviceProcessEvents",
+    "DeviceNetworkEvents", "DeviceFileEvents", "DeviceLogonEvents",
+    "ThreatIntelligenceIndicator", "SecurityAlert", "SecurityIncident"
+)
+
+# Keyword regex used by classify_prompt when Aho-Corasick is unavailable: one
+# named group per template, so a match's lastgroup is the template name. The
+# lookahead tests every position, so one keyword never hides an overlapping one.
+_KEYWORD_RE = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{name}>{'|'.join(keywords)})"
+        for name, keywords in _PROMPT_KEYWORDS.items()
+    ) + ")",
+    re.IGNORECASE
+)
+
+# Templates in the priority order used when a prompt matches several of them
+_PROMPT_PRIORITY = tuple(_PROMPT_KEYWORDS)
+
+# Parameters used when a prompt is mapped to a template
+_DEFAULT_PARAMS = {
+    "failed_logins": {"timeframe": "24h", "user_filter": "*"},
+    "suspicious_processes": {
+        "timeframe": "24h", "suspicious_commands": '("powershell", "cmd", "wscript")'
+    },
+    "network_connections": {"timeframe": "24h", "ports": "80,443,22,3389"},
+    "file_modifications": {
+        "timeframe": "24h", "file_paths": '("C:\\\\Windows\\\\System32", "C:\\\\Temp")'
+    },
+    "privilege_escalation": {"timeframe": "24h"},
+    "threat_hunting": {
+        "table_name": "SecurityEvent",
+        "timeframe": "24h",
+        "search_field": "Activity",
+        "display_fields": "TimeGenerated, Computer, Account, Activity",
+        "limit": "100"
+    }
+}
+
+# Prompt queries that do not depend on the prompt text, rendered once at import
+_DEFAULT_QUERIES = {
+    name: _TEMPLATES[name]["compiled"](**params)
+    for name, params in _DEFAULT_PARAMS.items()
+    if name != "threat_hunting"
+}
+
+
+def write_query(fp, query: str) -> None:
+    """Write a generated query to an open text file."""
+    fp.write(query)
+    fp.write("\n")
+
+
+def _write_stdout(text: str) -> None:
+    """Write text to stdout as a single encoded write on the underlying buffer."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(text)
+        return
+    sys.stdout.flush()
+    buffer.write(text.encode(sys.stdout.encoding or "utf-8", errors=sys.stdout.errors or "strict"))
+    buffer.flush()
+
+
+class KQLQueryGenerator:
+    """Main class for generating KQL queries based on user prompts."""
+    
+    def __init__(self):
+        self.query_templates = _TEMPLATES
+        self.common_tables = _COMMON_TABLES
+        self._priority = _PROMPT_PRIORITY
+        self._default_params = _DEFAULT_PARAMS
+        self._defaults = _DEFAULT_QUERIES
     
     def list_templates(self) -> None:
         """Display available query templates."""
@@ -114,7 +231,6 @@ class KQLQueryGenerator:
     def _generate_from_template(self, template_name: str) -> str:
         """Generate query from a specific template."""
         template = self.query_templates[template_name]
-        query = template["template"]
         
         print(f"\n📝 Configuring '{template_name}' query...")
         print(f"Description: {template['description']}")
@@ -154,9 +270,9 @@ class KQLQueryGenerator:
         
         # Replace parameters in template
         try:
-            formatted_query = query.format(**parameters)
+            formatted_query = template["compiled"](**parameters)
             return formatted_query
-        except KeyError as e:
+        except TypeError as e:
             print(f"❌ Missing parameter: {e}")
             return ""
     
@@ -184,43 +300,49 @@ class KQLQueryGenerator:
         
         return query
     
+    def classify_prompt(self, prompt: str) -> str:
+        """Return the name of the template that best matches a natural language prompt."""
+        # Simple keyword-based matching: the highest-priority template with a keyword hit wins
+        if _KEYWORD_AUTOMATON is not None:
+            # str.lower() already takes CPython's ASCII fast path for plain-text prompts
+            matched = {name for _, name in _KEYWORD_AUTOMATON.iter(prompt.lower())}
+        else:
+            matched = {match.lastgroup for match in _KEYWORD_RE.finditer(prompt)}
+        for name in self._priority:
+            if name in matched:
+                return name
+        return "threat_hunting"
+    
+    def classify_batch(self, prompts: List[str]) -> List[str]:
+        """Return the matching template name for each prompt in a batch."""
+        classify = self.classify_prompt
+        return [classify(prompt) for prompt in prompts]
+    
     def generate_from_prompt(self, prompt: str) -> str:
         """Generate KQL query from a natural language prompt."""
-        prompt_lower = prompt.lower()
+        template_name = self.classify_prompt(prompt)
+        query = self._defaults.get(template_name)
+        if query is not None:
+            return query
         
-        # Simple keyword-based matching
-        if any(word in prompt_lower for word in ["failed", "login", "signin", "authentication"]):
-            return self.query_templates["failed_logins"]["template"].format(
-                timeframe="24h", user_filter="*"
-            )
-        elif any(word in prompt_lower for word in ["process", "execution", "command"]):
-            return self.query_templates["suspicious_processes"]["template"].format(
-                timeframe="24h", suspicious_commands='("powershell", "cmd", "wscript")'
-            )
-        elif any(word in prompt_lower for word in ["network", "connection", "traffic"]):
-            return self.query_templates["network_connections"]["template"].format(
-                timeframe="24h", ports="80,443,22,3389"
-            )
-        elif any(word in prompt_lower for word in ["file", "creation", "modification"]):
-            return self.query_templates["file_modifications"]["template"].format(
-                timeframe="24h", file_paths='("C:\\\\Windows\\\\System32", "C:\\\\Temp")'
-            )
-        elif any(word in prompt_lower for word in ["privilege", "escalation", "admin"]):
-            return self.query_templates["privilege_escalation"]["template"].format(timeframe="24h")
-        else:
-            # Default to threat hunting template
-            return self.query_templates["threat_hunting"]["template"].format(
-                table_name="SecurityEvent",
-                timeframe="24h",
-                search_field="Activity",
-                search_term=prompt,
-                display_fields="TimeGenerated, Computer, Account, Activity",
-                limit="100"
-            )
+        # Threat hunting searches for the prompt itself, so it is rendered per call
+        params = dict(self._default_params[template_name], search_term=prompt)
+        return self.query_templates[template_name]["compiled"](**params)
+    
+    def write_queries_from_prompts(self, prompts: List[str], fp) -> int:
+        """Generate a query for each prompt and write them to an open file, blank-line separated."""
+        count = 0
+        for prompt in prompts:
+            if count:
+                fp.write("\n")
+            write_query(fp, self.generate_from_prompt(prompt))
+            count += 1
+        return count
 
 
-def main():
-    """Main entry point for the KQL Generator CLI."""
+@functools.lru_cache(maxsize=None)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser once and reuse it across calls."""
     parser = argparse.ArgumentParser(
         description="Generate KQL queries for cybersecurity analysis",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -230,6 +352,7 @@ Examples:
   python kql_generator.py --prompt "failed logins in the last 24 hours"
   python kql_generator.py --template failed_logins
   python kql_generator.py --list-templates
+  python kql_generator.py --batch prompts.txt --output queries.kql
         """
     )
     
@@ -263,7 +386,18 @@ Examples:
         help="Save query to file"
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        "--batch", "-b",
+        type=str,
+        help="Generate a query for each prompt (one per line) in a file"
+    )
+    
+    return parser
+
+
+def main():
+    """Main entry point for the KQL Generator CLI."""
+    args = _build_parser().parse_args()
     
     generator = KQLQueryGenerator()
     query = ""
@@ -272,6 +406,21 @@ Examples:
         generator.list_templates()
         return
     
+    if args.batch:
+        try:
+            with open(args.batch) as f:
+                prompts = [line.strip() for line in f if line.strip()]
+        except OSError as e:
+            print(f"❌ Could not read batch file: {e}")
+            sys.exit(1)
+        if args.output:
+            with open(args.output, 'w', buffering=1 << 16) as f:
+                count = generator.write_queries_from_prompts(prompts, f)
+            print(f"✅ {count} queries saved to {args.output}")
+        else:
+            generator.write_queries_from_prompts(prompts, sys.stdout)
+        return
+    
     if args.interactive:
         query = generator.generate_interactive_query()
     elif args.prompt:
@@ -288,11 +437,8 @@ Examples:
         query = generator.generate_interactive_query()
     
     if query:
-        print("\n" + "="*60)
-        print("🔍 Generated KQL Query:")
-        print("="*60)
-        print(query)
-        print("="*60)
+        rule = "=" * 60
+        _write_stdout(f"\n{rule}\n🔍 Generated KQL Query:\n{rule}\n{query}\n{rule}\n")
         
         if args.output:
             with open(args.output, 'w') as f:
@@ -8,9 +8,10 @@ Designed for cybersecurity professionals managing compliance with Controlled Unc
 import argparse
 import json
 import sys
+from collections import Counter
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
 
@@ -41,6 +42,11 @@ class ControlFamily(Enum):
     SYSTEM_INTEGRITY = "3.14"
 
 
+# Control family lookups by value, e.g. "3.1" -> ControlFamily.ACCESS_CONTROL
+_FAMILY_BY_VALUE: Dict[str, ControlFamily] = {cf.value: cf for cf in ControlFamily}
+_FAMILY_VALUES: Tuple[str, ...] = tuple(_FAMILY_BY_VALUE)
+
+
 @dataclass
 class NISTControl:
     """Represents a NIST 800-171 control."""
@@ -51,14 +57,140 @@ class NISTControl:
     azure_mappings: List[str]
     assessment_method: str
     status: ControlStatus = ControlStatus.NOT_ASSESSED
-    findings: List[str] = None
-    recommendations: List[str] = None
+    findings: List[str] = field(default_factory=list)
+    recommendations: List[str] = field(default_factory=list)
+
+
+def _build_control_template() -> Dict[str, NISTControl]:
+    """Build the NIST 800-171 control catalog with Azure mappings."""
+    controls = {}
+    
+    # Access Control Family (3.1)
+    controls["3.1.1"] = NISTControl(
+        control_id="3.1.1",
+        family=ControlFamily.ACCESS_CONTROL,
+        title="Limit system access to authorized users",
+        description="Limit information system access to authorized users, processes acting on behalf of authorized users, or devices (including other information systems).",
+        azure_mappings=[
+            "Azure Active Directory",
+            "Conditional Access Policies",
+            "Azure RBAC",
+            "Privileged Identity Management"
+        ],
+        assessment_method="Review user access controls and authentication mechanisms"
+    )
+    
+    controls["3.1.2"] = NISTControl(
+        control_id="3.1.2",
+        family=ControlFamily.ACCESS_CONTROL,
+        title="Limit transaction and function access",
+        description="Limit information system access to the types of transactions and functions that authorized users are permitted to execute.",
+        azure_mappings=[
+            "Azure RBAC",
+            "Azure Policy",
+            "Application Gateway",
+            "API Management"
+        ],
+        assessment_method="Review role-based access controls and function restrictions"
+    )
+    
+    # Configuration Management Family (3.4)
+    controls["3.4.1"] = NISTControl(
+        control_id="3.4.1",
+        family=ControlFamily.CONFIGURATION_MANAGEMENT,
+        title="Establish configuration baselines",
+        description="Establish and maintain baseline configurations and inventories of organizational systems (including hardware, software, firmware, and documentation).",
+        azure_mappings=[
+            "Azure Security Center",
+            "Azure Policy",
+            "Azure Resource Manager Templates",
+            "Azure Automation"
+        ],
+        assessment_method="Review configuration management policies and baseline documentation"
+    )
+    
+    # System and Communications Protection Family (3.13)
+    controls["3.13.1"] = NISTControl(
+        control_id="3.13.1",
+        family=ControlFamily.SYSTEM_COMMUNICATIONS_PROTECTION,
+        title="Monitor communications at system boundaries",
+        description="Monitor, control, and protect organizational communications (i.e., information transmitted or received by organizational information systems).",
+        azure_mappings=[
+            "Azure Firewall",
+            "Network Security Groups",
+            "Application Gateway",
+            "Azure Monitor"
+        ],
+        assessment_method="Review network monitoring and communication protection controls"
+    )
+    
+    # System and Information Integrity Family (3.14)
+    controls["3.14.1"] = NISTControl(
+        control_id="3.14.1",
+        family=ControlFamily.SYSTEM_INTEGRITY,
+        title="Identify and correct system flaws",
+        description="Identify, report, and correct information and information system flaws in a timely manner.",
+        azure_mappings=[
+            "Azure Security Center",
+            "Azure Update Management",
+            "Vulnerability Assessment",
+            "Microsoft Defender for Cloud"
+        ],
+        assessment_method="Review vulnerability management and patch management processes"
+    )
+    
+    return controls
 
-    def __post_init__(self):
-        if self.findings is None:
-            self.findings = []
-        if self.recommendations is None:
-            self.recommendations = []
+
+# Control catalog built once at import; assessments work on copies of it
+_CONTROL_TEMPLATE: Dict[str, NISTControl] = _build_control_template()
+
+# Simulated assessment results: control_id -> (status, findings, recommendations)
+_ASSESSMENT_RESULTS: Dict[str, Tuple[ControlStatus, Tuple[str, ...], Tuple[str, ...]]] = {
+    "3.1.1": (
+        ControlStatus.COMPLIANT,
+        ("Azure AD authentication properly configured",),
+        ("Consider implementing MFA for all users",)
+    ),
+    "3.1.2": (
+        ControlStatus.PARTIALLY_COMPLIANT,
+        ("RBAC roles defined but some over-privileged accounts found",),
+        ("Review and right-size user permissions", "Implement least privilege access")
+    ),
+    "3.4.1": (
+        ControlStatus.NON_COMPLIANT,
+        ("Configuration baselines not formally documented",),
+        ("Establish formal configuration baselines", "Implement Infrastructure as Code")
+    ),
+    "3.13.1": (
+        ControlStatus.COMPLIANT,
+        ("Network monitoring configured via Azure Monitor",),
+        ("Consider implementing additional DDoS protection",)
+    ),
+    "3.14.1": (
+        ControlStatus.COMPLIANT,
+        ("Vulnerability assessment enabled", "Update management configured"),
+        ("Automate patch deployment where possible",)
+    )
+}
+
+
+# Summary report header, filled by _generate_summary_report
+_SUMMARY_TEMPLATE = """
+NIST 800-171 Compliance Assessment Report
+========================================
+Assessment Date: {assessment_date}
+Total Controls Assessed: {total}
+
+Compliance Summary:
+- Compliant: {compliant} ({compliant_pct:.1f}%)
+- Partially Compliant: {partially_compliant} ({partially_compliant_pct:.1f}%)
+- Non-Compliant: {non_compliant} ({non_compliant_pct:.1f}%)
+- Not Assessed: {not_assessed} ({not_assessed_pct:.1f}%)
+
+High Priority Remediation Items:
+"""
+_SUMMARY_STATUSES = ("compliant", "partially_compliant", "non_compliant", "not_assessed")
 
 
 class NISTGRCAssessment:
@@ -67,86 +199,25 @@ class NISTGRCAssessment:
     def __init__(self):
         self.controls = self._initialize_controls()
         self.assessment_date = datetime.now()
+        self._assessed = False
+        
+        # Index control IDs by family so family assessments skip unrelated controls
+        self._by_family: Dict[ControlFamily, List[str]] = {}
+        for control_id, control in self.controls.items():
+            self._by_family.setdefault(control.family, []).append(control_id)
         
     def _initialize_controls(self) -> Dict[str, NISTControl]:
         """Initialize NIST 800-171 controls with Azure mappings."""
-        controls = {}
-        
-        # Access Control Family (3.1)
-        controls["3.1.1"] = NISTControl(
-            control_id="3.1.1",
-            family=ControlFamily.ACCESS_CONTROL,
-            title="Limit system access to authorized users",
-            description="Limit information system access to authorized users, processes acting on behalf of authorized users, or devices (including other information systems).",
-            azure_mappings=[
-                "Azure Active Directory",
-                "Conditional Access Policies",
-                "Azure RBAC",
-                "Privileged Identity Management"
-            ],
-            assessment_method="Review user access controls and authentication mechanisms"
-        )
-        
-        controls["3.1.2"] = NISTControl(
-            control_id="3.1.2",
-            family=ControlFamily.ACCESS_CONTROL,
-            title="Limit transaction and function access",
-            description="Limit information system access to the types of transactions and functions that authorized users are permitted to execute.",
-            azure_mappings=[
-                "Azure RBAC",
-                "Azure Policy",
-                "Application Gateway",
-                "API Management"
-            ],
-            assessment_method="Review role-based access controls and function restrictions"
-        )
-        
-        # Configuration Management Family (3.4)
-        controls["3.4.1"] = NISTControl(
-            control_id="3.4.1",
-            family=ControlFamily.CONFIGURATION_MANAGEMENT,
-            title="Establish configuration baselines",
-            description="Establish and maintain baseline configurations and inventories of organizational systems (including hardware, software, firmware, and documentation).",
-            azure_mappings=[
-                "Azure Security Center",
-                "Azure Policy",
-                "Azure Resource Manager Templates",
-                "Azure Automation"
-            ],
-            assessment_method="Review configuration management policies and baseline documentation"
-        )
-        
-        # System and Communications Protection Family (3.13)
-        controls["3.13.1"] = NISTControl(
-            control_id="3.13.1",
-            family=ControlFamily.SYSTEM_COMMUNICATIONS_PROTECTION,
-            title="Monitor communications at system boundaries",
-            description="Monitor, control, and protect organizational communications (i.e., information transmitted or received by organizational information systems).",
-            azure_mappings=[
-                "Azure Firewall",
-                "Network Security Groups",
-                "Application Gateway",
-                "Azure Monitor"
-            ],
-            assessment_method="Review network monitoring and communication protection controls"
-        )
-        
-        # System and Information Integrity Family (3.14)
-        controls["3.14.1"] = NISTControl(
-            control_id="3.14.1",
-            family=ControlFamily.SYSTEM_INTEGRITY,
-            title="Identify and correct system flaws",
-            description="Identify, report, and correct information and information system flaws in a timely manner.",
-            azure_mappings=[
-                "Azure Security Center",
-                "Azure Update Management",
-                "Vulnerability Assessment",
-                "Microsoft Defender for Cloud"
-            ],
-            assessment_method="Review vulnerability management and patch management processes"
-        )
-        
-        return controls
+        # Copy the shared catalog so each assessment gets its own mutable state
+        return {
+            control_id: replace(
+                control,
+                azure_mappings=list(control.azure_mappings),
+                findings=[],
+                recommendations=[]
+            )
+            for control_id, control in _CONTROL_TEMPLATE.items()
+        }
     
     def assess_control(self, control_id: str) -> NISTControl:
         """Assess a specific NIST 800-171 control."""
@@ -156,42 +227,26 @@ class NISTGRCAssessment:
         control = self.controls[control_id]
         
         # Simulate assessment logic (in real implementation, this would check Azure resources)
-        if control_id == "3.1.1":
-            control.status = ControlStatus.COMPLIANT
-            control.findings = ["Azure AD authentication properly configured"]
-            control.recommendations = ["Consider implementing MFA for all users"]
-        elif control_id == "3.1.2":
-            control.status = ControlStatus.PARTIALLY_COMPLIANT
-            control.findings = ["RBAC roles defined but some over-privileged accounts found"]
-            control.recommendations = ["Review and right-size user permissions", "Implement least privilege access"]
-        elif control_id == "3.4.1":
-            control.status = ControlStatus.NON_COMPLIANT
-            control.findings = ["Configuration baselines not formally documented"]
-            control.recommendations = ["Establish formal configuration baselines", "Implement Infrastructure as Code"]
-        elif control_id == "3.13.1":
-            control.status = ControlStatus.COMPLIANT
-            control.findings = ["Network monitoring configured via Azure Monitor"]
-            control.recommendations = ["Consider implementing additional DDoS protection"]
-        elif control_id == "3.14.1":
-            control.status = ControlStatus.COMPLIANT
-            control.findings = ["Vulnerability assessment enabled", "Update management configured"]
-            control.recommendations = ["Automate patch deployment where possible"]
+        result = _ASSESSMENT_RESULTS.get(control_id)
+        if result:
+            status, findings, recommendations = result
+            control.status = status
+            control.findings = list(findings)
+            control.recommendations = list(recommendations)
         
         return control
     
     def assess_control_family(self, family: ControlFamily) -> List[NISTControl]:
         """Assess all controls in a specific family."""
-        family_controls = []
-        for control_id, control in self.controls.items():
-            if control.family == family:
-                assessed_control = self.assess_control(control_id)
-                family_controls.append(assessed_control)
-        return family_controls
+        return [self.assess_control(control_id) for control_id in self._by_family.get(family, ())]
     
     def assess_all_controls(self) -> Dict[str, NISTControl]:
         """Assess all NIST 800-171 controls."""
+        if self._assessed:
+            return self.controls
         for control_id in self.controls:
             self.assess_control(control_id)
+        self._assessed = True
         return self.controls
     
     def generate_gap_analysis(self) -> Dict[str, List[str]]:
@@ -211,8 +266,12 @@ class NISTGRCAssessment:
         
         return gaps
     
-    def generate_compliance_report(self, format: str = "json") -> str:
-        """Generate compliance assessment report."""
+    def generate_compliance_report(self, format: str = "json", fp=None, pretty: bool = True) -> Optional[str]:
+        """Generate compliance assessment report.
+        
+        If fp is given, the report is written to that open file and None is returned.
+        JSON uses compact separators when pretty is False.
+        """
         report_data = {
             "assessment_date": self.assessment_date.isoformat(),
             "total_controls": len(self.controls),
@@ -230,20 +289,23 @@ class NISTGRCAssessment:
                 "recommendations": control.recommendations
             }
         
-        if format == "json":
-            return json.dumps(report_data, indent=2)
-        elif format == "summary":
-            return self._generate_summary_report(report_data)
-        else:
-            return json.dumps(report_data, indent=2)
+        if format == "summary":
+            report = self._generate_summary_report(report_data)
+            if fp is None:
+                return report
+            fp.write(report)
+            return None
+        
+        json_options = {"indent": 2} if pretty else {"separators": (",", ":")}
+        if fp is None:
+            return json.dumps(report_data, **json_options)
+        json.dump(report_data, fp, **json_options)
+        return None
     
     def _get_compliance_summary(self) -> Dict[str, int]:
         """Get summary of compliance status."""
         summary = {status.value: 0 for status in ControlStatus}
-        
-        for control in self.controls.values():
-            summary[control.status.value] += 1
-        
+        summary.update(Counter(control.status.value for control in self.controls.values()))
         return summary
     
     def _generate_summary_report(self, report_data: Dict) -> str:
@@ -251,26 +313,28 @@ class NISTGRCAssessment:
         summary = report_data["compliance_summary"]
         total = report_data["total_controls"]
         
-        report = f"""
-NIST 800-171 Compliance Assessment Report
-========================================
-Assessment Date: {report_data["assessment_date"]}
-Total Controls Assessed: {total}
-
-Compliance Summary:
-- Compliant: {summary.get('compliant', 0)} ({(summary.get('compliant', 0)/total)*100:.1f}%)
-- Partially Compliant: {summary.get('partially_compliant', 0)} ({(summary.get('partially_compliant', 0)/total)*100:.1f}%)
-- Non-Compliant: {summary.get('non_compliant', 0)} ({(summary.get('non_compliant', 0)/total)*100:.1f}%)
-- Not Assessed: {summary.get('not_assessed', 0)} ({(summary.get('not_assessed', 0)/total)*100:.1f}%)
-
-High Priority Remediation Items:
-"""
+        values = {"assessment_date": report_data["assessment_date"], "total": total}
+        for status in _SUMMARY_STATUSES:
+            count = summary.get(status, 0)
+            values[status] = count
+            values[f"{status}_pct"] = (count / total) * 100
+        parts = [_SUMMARY_TEMPLATE.format_map(values)]
         
         for control_id, control_data in report_data["controls"].items():
             if control_data["status"] == "non_compliant":
-                report += f"- {control_id}: {control_data['title']}\n"
+                parts.append(f"- {control_id}: {control_data['title']}\n")
         
-        return report
+        return "".join(parts)
+
+
+def _report_output(assessment: NISTGRCAssessment, args: argparse.Namespace) -> str:
+    """Stream the compliance report to --output if given, otherwise return it for printing."""
+    if not args.output:
+        return assessment.generate_compliance_report(args.format, pretty=not args.compact)
+    
+    with open(args.output, 'w') as f:
+        assessment.generate_compliance_report(args.format, fp=f, pretty=not args.compact)
+    return ""
 
 
 def main():
@@ -336,17 +400,26 @@ Examples:
         help="Save output to file"
     )
     
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON reports without indentation"
+    )
+    
     args = parser.parse_args()
     
     # Create assessment instance
     assessment = NISTGRCAssessment()
     output = ""
+    # Set when the report was streamed straight to --output
+    streamed = False
     
     try:
         if args.assess:
             print("🔍 Running NIST 800-171 compliance assessment...")
             assessment.assess_all_controls()
-            output = assessment.generate_compliance_report(args.format)
+            output = _report_output(assessment, args)
+            streamed = bool(args.output)
             print("✅ Assessment completed")
             
         elif args.control:
@@ -367,9 +440,8 @@ Recommendations: {', '.join(control.recommendations) if control.recommendations
 """
             
         elif args.control_family:
-            family_map = {cf.value: cf for cf in ControlFamily}
-            if args.control_family in family_map:
-                family = family_map[args.control_family]
+            family = _FAMILY_BY_VALUE.get(args.control_family)
+            if family is not None:
                 print(f"🔍 Assessing control family {args.control_family}...")
                 controls = assessment.assess_control_family(family)
                 
@@ -384,18 +456,18 @@ Recommendations: {', '.join(control.recommendations) if control.recommendations
                         }
                     output = json.dumps(family_data, indent=2)
                 else:
-                    output = f"\nControl Family {args.control_family} Assessment Results:\n"
-                    output += "=" * 50 + "\n"
+                    parts = [f"\nControl Family {args.control_family} Assessment Results:\n", "=" * 50 + "\n"]
                     for control in controls:
-                        output += f"\n{control.control_id}: {control.title}\n"
-                        output += f"Status: {control.status.value.title()}\n"
+                        parts.append(f"\n{control.control_id}: {control.title}\n")
+                        parts.append(f"Status: {control.status.value.title()}\n")
                         if args.detailed:
-                            output += f"Findings: {', '.join(control.findings) if control.findings else 'None'}\n"
-                            output += f"Recommendations: {', '.join(control.recommendations) if control.recommendations else 'None'}\n"
-                        output += "-" * 30 + "\n"
+                            parts.append(f"Findings: {', '.join(control.findings) if control.findings else 'None'}\n")
+                            parts.append(f"Recommendations: {', '.join(control.recommendations) if control.recommendations else 'None'}\n")
+                        parts.append("-" * 30 + "\n")
+                    output = "".join(parts)
             else:
                 print(f"❌ Invalid control family: {args.control_family}")
-                print("Valid families:", [cf.value for cf in ControlFamily])
+                print("Valid families:", list(_FAMILY_VALUES))
                 sys.exit(1)
                 
         elif args.gap_analysis:
@@ -403,28 +475,30 @@ Recommendations: {', '.join(control.recommendations) if control.recommendations
             assessment.assess_all_controls()
             gaps = assessment.generate_gap_analysis()
             
-            output = "\nNIST 800-171 Gap Analysis Report\n"
-            output += "=" * 40 + "\n"
+            parts = ["\nNIST 800-171 Gap Analysis Report\n", "=" * 40 + "\n"]
             for severity, items in gaps.items():
                 if items:
-                    output += f"\n{severity.title()} Priority Gaps:\n"
+                    parts.append(f"\n{severity.title()} Priority Gaps:\n")
                     for item in items:
-                        output += f"  • {item}\n"
+                        parts.append(f"  • {item}\n")
+            output = "".join(parts)
             
         elif args.report:
             print("📊 Generating compliance report...")
             assessment.assess_all_controls()
-            output = assessment.generate_compliance_report(args.format)
+            output = _report_output(assessment, args)
+            streamed = bool(args.output)
             
         else:
             parser.print_help()
             sys.exit(1)
         
         # Output results
-        if output:
+        if output or streamed:
             if args.output:
-                with open(args.output, 'w') as f:
-                    f.write(output)
+                if output:
+                    with open(args.output, 'w') as f:
+                        f.write(output)
                 print(f"✅ Output saved to {args.output}")
             else:
                 print(output)
@@ -4,10 +4,14 @@ Test script for KQL Query Generator
 Simple validation tests to ensure the generator works correctly.
 """
 
+import contextlib
+import io
 import os
 import sys
 import subprocess
-from kql_generator import KQLQueryGenerator
+import tempfile
+import kql_generator
+from kql_generator import KQLQueryGenerator, main
 
 
 def test_generator_creation():
@@ -15,6 +19,7 @@ def test_generator_creation():
     generator = KQLQueryGenerator()
     assert generator is not None
     assert len(generator.query_templates) > 0
+    assert KQLQueryGenerator().query_templates is generator.query_templates
     print("✅ Generator creation test passed")
 
 
@@ -48,27 +53,132 @@ def test_prompt_generation():
         assert query is not None and len(query) > 0, f"No query generated for prompt: {prompt}"
         assert expected_table in query, f"Expected table {expected_table} not found in query for prompt: {prompt}"
     
+    # Prompts without a known keyword fall back to threat hunting
+    query = generator.generate_from_prompt("hunt for malware")
+    assert 'has "hunt for malware"' in query, "Threat hunting fallback did not include prompt"
+    
     print("✅ Prompt generation test passed")
 
 
+def test_classify_batch():
+    """Test classifying a batch of prompts into template names."""
+    generator = KQLQueryGenerator()
+    
+    prompts = ["failed logins", "network traffic", "hunt for malware", "process that failed"]
+    expected = ["failed_logins", "network_connections", "threat_hunting", "failed_logins"]
+    assert generator.classify_batch(prompts) == expected
+    
+    print("✅ Batch classification test passed")
+
+
+def test_keyword_matching_paths():
+    """Test that the automaton and regex matching paths classify prompts alike."""
+    generator = KQLQueryGenerator()
+    
+    cases = [
+        ("failed logins", "failed_logins"),
+        ("suspicious process", "suspicious_processes"),
+        ("network connections", "network_connections"),
+        ("file creation", "file_modifications"),
+        ("Administrators added", "privilege_escalation"),
+        ("process that failed", "failed_logins"),
+        ("filesignin", "failed_logins"),
+        ("hunt for malware", "threat_hunting")
+    ]
+    
+    automaton = kql_generator._KEYWORD_AUTOMATON
+    paths = [automaton, None] if automaton is not None else [None]
+    try:
+        for path in paths:
+            kql_generator._KEYWORD_AUTOMATON = path
+            for prompt, expected in cases:
+                name = generator.classify_prompt(prompt)
+                assert name == expected, f"{prompt!r} -> {name} (automaton={path is not None})"
+    finally:
+        kql_generator._KEYWORD_AUTOMATON = automaton
+    
+    print("✅ Keyword matching paths test passed")
+
+
+def test_write_queries_from_prompts():
+    """Test writing batch-generated queries to an open file."""
+    generator = KQLQueryGenerator()
+    
+    buf = io.StringIO()
+    count = generator.write_queries_from_prompts(["failed logins", "network traffic"], buf)
+    output = buf.getvalue()
+    assert count == 2
+    assert "SigninLogs" in output and "DeviceNetworkEvents" in output
+    assert output.endswith("\n")
+    
+    print("✅ Batch query writing test passed")
+
+
+def test_compiled_templates():
+    """Test that compiled templates render the same as str.format."""
+    generator = KQLQueryGenerator()
+    
+    for name, template in generator.query_templates.items():
+        params = {param: f"<{param}>" for param in template["parameters"]}
+        expected = template["template"].format(**params)
+        assert template["compiled"](**params) == expected, f"Compiled template {name} differs"
+    
+    print("✅ Compiled templates test passed")
+
+
+def run_cli(*args):
+    """Run the CLI in-process and return its exit code and captured stdout."""
+    old_argv = sys.argv
+    sys.argv = ["kql_generator.py", *args]
+    buf = io.StringIO()
+    code = 0
+    try:
+        with contextlib.redirect_stdout(buf):
+            main()
+    except SystemExit as e:
+        code = e.code or 0
+    finally:
+        sys.argv = old_argv
+    return code, buf.getvalue()
+
+
 def test_cli_functionality():
     """Test the CLI interface."""
-    # Test help
+    # Smoke test the script entry point once in a subprocess
     result = subprocess.run([sys.executable, "kql_generator.py", "--help"], 
                           capture_output=True, text=True)
     assert result.returncode == 0, "Help command failed"
     
     # Test list templates
-    result = subprocess.run([sys.executable, "kql_generator.py", "--list-templates"], 
-                          capture_output=True, text=True)
-    assert result.returncode == 0, "List templates command failed"
-    assert "failed_logins" in result.stdout, "Template not found in output"
+    code, output = run_cli("--list-templates")
+    assert code == 0, "List templates command failed"
+    assert "failed_logins" in output, "Template not found in output"
     
     # Test prompt
-    result = subprocess.run([sys.executable, "kql_generator.py", "--prompt", "failed logins"], 
-                          capture_output=True, text=True)
-    assert result.returncode == 0, "Prompt command failed"
-    assert "SigninLogs" in result.stdout, "Expected query output not found"
+    code, output = run_cli("--prompt", "failed logins")
+    assert code == 0, "Prompt command failed"
+    assert "SigninLogs" in output, "Expected query output not found"
+    
+    # Test batch prompts from a file
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_path = os.path.join(tmp, "prompts.txt")
+        with open(batch_path, "w") as f:
+            f.write("failed logins\n\nnetwork traffic\n")
+        code, output = run_cli("--batch", batch_path)
+        assert code == 0, "Batch command failed"
+        assert "SigninLogs" in output and "DeviceNetworkEvents" in output
+        
+        # Test a missing batch file
+        code, output = run_cli("--batch", os.path.join(tmp, "missing.txt"))
+        assert code == 1, "Missing batch file should exit non-zero"
+        assert "❌" in output
+        
+        # Test saving a single query writes it unchanged
+        out_path = os.path.join(tmp, "query.kql")
+        code, output = run_cli("--prompt", "failed logins", "--output", out_path)
+        assert code == 0, "Prompt with output failed"
+        with open(out_path) as f:
+            assert f.read() == KQLQueryGenerator().generate_from_prompt("failed logins")
     
     print("✅ CLI functionality test passed")
 
@@ -82,6 +192,10 @@ def run_tests():
         test_generator_creation()
         test_template_listing()
         test_prompt_generation()
+        test_classify_batch()
+        test_keyword_matching_paths()
+        test_write_queries_from_prompts()
+        test_compiled_templates()
         test_cli_functionality()
         
         print("\n🎉 All tests passed!")